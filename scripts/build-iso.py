@@ -15,11 +15,23 @@ Requirements:
 """
 
 import argparse
+import errno
+import fcntl
+import hashlib
+import http.client
+import importlib.util
 import os
+import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
 try:
@@ -27,6 +39,29 @@ try:
 except ImportError:
     import tomli as tomllib
 
+# Base profile shipped by the archiso package
+RELENG_PATH = Path("/usr/share/archiso/configs/releng")
+
+# ArchZFS mirrors, in pacman Server syntax
+ARCHZFS_SERVERS = [
+    "https://archzfs.com/$repo/$arch",
+    "https://mirror.sum7.eu/archlinux/archzfs/$repo/$arch",
+]
+
+# Persistent cache shared across builds
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "live-iso"
+
+# Cache entries and staging leftovers untouched for this long (seconds) may
+# be pruned; a build using a pinned repo entry refreshes its mtime, so
+# concurrent builds keep theirs
+CACHE_MAX_AGE = 24 * 60 * 60
+
+# ioctl request number for FICLONE from <linux/fs.h>
+FICLONE = 0x40049409
+
+# errnos meaning the filesystem pair cannot share extents
+REFLINK_UNSUPPORTED = {errno.EXDEV, errno.EOPNOTSUPP, errno.EINVAL, errno.ENOTTY}
+
 
 def log(level: str, msg: str):
     """Simple logging."""
@@ -41,31 +76,107 @@ def log(level: str, msg: str):
     print(f"{color}[{level}]{reset} {msg}")
 
 
-def run_cmd(cmd: list[str], check: bool = True, **kwargs) -> subprocess.CompletedProcess:
+def run_cmd(
+    cmd: list[str], check: bool = True, env: dict[str, str] | None = None, **kwargs
+) -> subprocess.CompletedProcess:
     """Run a command with logging."""
     log("INFO", f"Running: {' '.join(cmd)}")
-    return subprocess.run(cmd, check=check, **kwargs)
+    return subprocess.run(cmd, check=check, env=env, **kwargs)
 
 
-def load_config(config_path: Path) -> dict:
+@dataclass(frozen=True, slots=True)
+class BuildConfig:
+    """Build settings read from the TOML config."""
+
+    ssh_authorized_keys_file: str = "config/ssh-keys"
+
+
+def load_config(config_path: Path) -> BuildConfig:
     """Load configuration from TOML file."""
     if not config_path.exists():
         log("WARN", f"Config file not found: {config_path}, using defaults")
-        return {}
+        return BuildConfig()
 
     with open(config_path, "rb") as f:
-        return tomllib.load(f)
+        data = tomllib.load(f)
+
+    defaults = BuildConfig()
+    ssh_config = data.get("ssh", {})
+    return BuildConfig(
+        ssh_authorized_keys_file=ssh_config.get("authorized_keys_file", defaults.ssh_authorized_keys_file),
+    )
+
 
+def archiso_version() -> str | None:
+    """Return the installed archiso package version, or None if unknown."""
+    try:
+        result = run_cmd(["pacman", "-Q", "archiso"], check=False, capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.split()[-1]
+
+
+def stage_pinned_repo(key: str) -> Path:
+    """
+    Create a private cache staging dir to build a pinned repository in,
+    pruning entries that have not been used recently.
 
-def setup_pinned_kernel_repo(work_dir: Path) -> tuple[str, str]:
+    Returns:
+        Path to the staging dir
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cutoff = time.time() - CACHE_MAX_AGE
+    for entry in CACHE_DIR.iterdir():
+        if (
+            entry.name != key
+            and (entry / "pinned-repo").is_dir()
+            and entry.stat().st_mtime < cutoff
+        ):
+            shutil.rmtree(entry, ignore_errors=True)
+
+    # Private, so a crash or a concurrent build never leaves a partial entry
+    return Path(tempfile.mkdtemp(prefix=f"{key}.", dir=CACHE_DIR))
+
+
+def publish_pinned_repo(staging: Path, key: str) -> Path:
+    """
+    Move a built staging dir into place as the cache entry for key.
+
+    Returns:
+        Path to the pinned repository to use
+    """
+    entry = CACHE_DIR / key
+    try:
+        staging.rename(entry)
+    except OSError as e:
+        if not (entry / "pinned-repo").is_dir():
+            log("WARN", f"Failed to cache pinned repo: {e}")
+            return staging / "pinned-repo"
+        # Another build stored the same key first
+        shutil.rmtree(staging, ignore_errors=True)
+    log("INFO", f"Cached pinned repository: {entry}")
+    return entry / "pinned-repo"
+
+
+def setup_pinned_kernel_repo(
+    work_dir: Path, archiso_ver: str | None, use_cache: bool = True
+) -> tuple[str, str, Path]:
     """
     Use zfspin to setup a local repository with pinned kernel/ZFS packages.
 
+    The repository is cached under CACHE_DIR, keyed by kernel version,
+    zfs-utils commit and archiso version, and reused on later builds.
+    Caching is skipped when the archiso version is unknown.
+
     Returns:
-        Tuple of (kernel_package_name, zfs_package_name)
+        Tuple of (kernel_package_name, zfs_package_name, repo_dir)
     """
     log("STEP", "Setting up pinned kernel/ZFS repository...")
 
+    use_cache = use_cache and archiso_ver is not None
+
     try:
         from zfspin import PinningConfig
         from zfspin.repository import LocalRepository
@@ -77,32 +188,59 @@ def setup_pinned_kernel_repo(work_dir: Path) -> tuple[str, str]:
         log("INFO", f"Detected kernel: {config.kernel_version}")
         log("INFO", f"Detected ZFS utils: {config.zfs_utils_version}")
 
-        # Create local repository
+        # Determine package names
+        kernel_name = "linux-lts" if "lts" in config.kernel_version else "linux"
+        zfs_name = f"zfs-{kernel_name}"
+
         repo_dir = work_dir / "pinned-repo"
-        repo_dir.mkdir(parents=True, exist_ok=True)
 
-        repo = LocalRepository(repo_dir)
+        # Reuse a repository built for the same versions
+        cache_key = hashlib.sha256(
+            f"{config.kernel_version}|{config.zfs_utils_commit}|{archiso_ver}".encode()
+        ).hexdigest()[:16]
+        cached_repo = CACHE_DIR / cache_key / "pinned-repo"
+        if use_cache and cached_repo.is_dir():
+            log("INFO", f"Using cached pinned repository: {cached_repo}")
+            # Mark the entry as in use so other builds do not prune it
+            os.utime(cached_repo.parent)
+            repo_dir.symlink_to(cached_repo, target_is_directory=True)
+            return kernel_name, zfs_name, repo_dir
+
+        # Build straight into the cache so a miss costs no extra copy
+        build_dir = repo_dir
+        if use_cache:
+            try:
+                staging = stage_pinned_repo(cache_key)
+                build_dir = staging / "pinned-repo"
+            except OSError as e:
+                log("WARN", f"Pinned repo cache unavailable: {e}")
+                use_cache = False
+
+        # Create local repository
+        build_dir.mkdir(parents=True, exist_ok=True)
+
+        repo = LocalRepository(build_dir)
 
         # Download kernel packages
         downloader = ArchiveDownloader(config, work_dir)
         kernel_pkgs = downloader.download_kernel_packages(
             config.kernel_version,
-            repo_dir
+            build_dir
         )
 
         # Build zfs-utils from AUR
         builder = AURBuilder(config, work_dir)
         zfs_utils_pkg = builder.build_zfs_utils(
             config.zfs_utils_commit,
-            repo_dir
+            build_dir
         )
 
         # Add packages to local repo
         repo.add_packages(kernel_pkgs + [zfs_utils_pkg])
 
-        # Determine package names
-        kernel_name = "linux-lts" if "lts" in config.kernel_version else "linux"
-        zfs_name = f"zfs-{kernel_name}"
+        if use_cache:
+            cached_repo = publish_pinned_repo(staging, cache_key)
+            repo_dir.symlink_to(cached_repo, target_is_directory=True)
 
         return kernel_name, zfs_name, repo_dir
 
@@ -114,37 +252,157 @@ def setup_pinned_kernel_repo(work_dir: Path) -> tuple[str, str]:
         sys.exit(1)
 
 
-def setup_archiso_profile(work_dir: Path, repo_root: Path) -> Path:
-    """Setup archiso profile from releng template."""
+def reflink_file(src: str, dst: str) -> bool:
+    """
+    Clone src into dst sharing data extents (btrfs, xfs with reflink).
+
+    Returns:
+        True if the clone succeeded, False if the filesystem lacks support
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError as e:
+            if e.errno in REFLINK_UNSUPPORTED:
+                return False
+            raise
+    shutil.copystat(src, dst)
+    return True
+
+
+def clone_tree(src: Path, dst: Path, reflink: bool | None = None) -> bool:
+    """
+    Copy a directory tree, using reflinks where the filesystem allows it.
+
+    Symlinks are recreated verbatim. Falls back to a regular copy on the
+    first file that cannot be reflinked. Set LIVEISO_DISABLE_REFLINK=1 to
+    always copy.
+
+    Returns:
+        Whether reflinks are still being attempted
+    """
+    if reflink is None:
+        reflink = os.environ.get("LIVEISO_DISABLE_REFLINK") != "1"
+
+    os.makedirs(dst, exist_ok=True)
+    with os.scandir(src) as entries:
+        for entry in entries:
+            target = os.path.join(dst, entry.name)
+            if entry.is_symlink():
+                os.symlink(os.readlink(entry.path), target)
+            elif entry.is_dir():
+                reflink = clone_tree(entry.path, target, reflink)
+            elif entry.is_file(follow_symlinks=False):
+                if not (reflink and reflink_file(entry.path, target)):
+                    reflink = False
+                    shutil.copy2(entry.path, target)
+            else:
+                # Raises SpecialFileError for FIFOs, like copytree did
+                shutil.copy2(entry.path, target)
+    shutil.copystat(src, dst)
+
+    return reflink
+
+
+def copy_overlay(src: Path, dst: Path, copy_function=shutil.copy):
+    """
+    Copy all files from an overlay tree into dst, overwriting existing files.
+
+    Pass copy_function=shutil.copyfile when file modes do not matter.
+    """
+    # copytree walks with os.scandir; for shutil.copy/copy2 it also hands the
+    # DirEntry to the copy so its cached stat is reused
+    shutil.copytree(src, dst, symlinks=True, dirs_exist_ok=True, copy_function=copy_function)
+
+
+def pack_releng(archive: Path):
+    """Store a zstd tarball of the releng profile in the cache, dropping older ones."""
+    staging = None
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cutoff = time.time() - CACHE_MAX_AGE
+        for stale in CACHE_DIR.glob("releng-*.tar.zst*"):
+            if stale == archive:
+                continue
+            try:
+                # Staging files are only stale once no pack can still be writing them
+                if stale.suffix == ".zst" or stale.stat().st_mtime < cutoff:
+                    stale.unlink()
+            except FileNotFoundError:
+                pass
+
+        # Private staging file so concurrent builds never write the same path
+        fd, staging = tempfile.mkstemp(prefix=f"{archive.name}.", dir=CACHE_DIR)
+        os.close(fd)
+        run_cmd(["tar", "-I", "zstd -T0", "-cf", staging, "-C", str(RELENG_PATH), "."])
+        os.replace(staging, archive)
+        log("INFO", f"Cached releng snapshot: {archive}")
+    except (OSError, subprocess.CalledProcessError) as e:
+        log("WARN", f"Failed to cache releng profile: {e}")
+        if staging:
+            Path(staging).unlink(missing_ok=True)
+
+
+def copy_boot_config(boot_dir: str, boot_src: Path, src_file: str, dst_file: str):
+    """Copy one boot config file and log it."""
+    # Boot configs are plain data, so skip copying the file mode
+    shutil.copyfile(src_file, dst_file)
+    log("INFO", f"Copied boot config: {boot_dir}/{os.path.relpath(src_file, boot_src)}")
+
+
+def setup_archiso_profile(
+    work_dir: Path, repo_root: Path, archiso_ver: str | None, use_cache: bool = True
+) -> Path:
+    """
+    Setup archiso profile from releng template.
+
+    The releng profile is kept in CACHE_DIR as a zstd tarball keyed by
+    archiso version and unpacked from there on later builds. Caching is
+    skipped when the archiso version is unknown.
+    """
     log("STEP", "Setting up archiso profile...")
 
     profile_dir = work_dir / "profile"
 
     # Copy releng profile as base
-    releng_path = Path("/usr/share/archiso/configs/releng")
-    if not releng_path.exists():
+    if not RELENG_PATH.exists():
         log("ERROR", "archiso not installed. Install with: pacman -S archiso")
         sys.exit(1)
 
-    # Use symlinks=True to preserve symlinks instead of following them
-    shutil.copytree(releng_path, profile_dir, symlinks=True)
+    # Unpacking one cached archive beats walking the releng tree file by file
+    archive = CACHE_DIR / f"releng-{archiso_ver}.tar.zst"
+    use_snapshot = use_cache and archiso_ver is not None and shutil.which("zstd") is not None
+    extracted = False
+    if use_snapshot and archive.exists():
+        profile_dir.mkdir(parents=True)
+        try:
+            run_cmd(["tar", "-I", "zstd -T0", "-xpf", str(archive), "-C", str(profile_dir)])
+            extracted = True
+        except subprocess.CalledProcessError as e:
+            # Drop a corrupt snapshot so it is repacked below
+            log("WARN", f"Cached releng snapshot unusable, copying releng instead: {e}")
+            archive.unlink(missing_ok=True)
+            shutil.rmtree(profile_dir)
+
+    if not extracted:
+        # Symlinks are preserved instead of followed
+        clone_tree(RELENG_PATH, profile_dir)
+        # Pack for next time; this runs while the pinned repo is still
+        # being set up, so it rarely lengthens the build
+        if use_snapshot:
+            pack_releng(archive)
 
     # Copy our minimal packages list
     packages_src = repo_root / "iso" / "packages.x86_64"
     packages_dst = profile_dir / "packages.x86_64"
-    shutil.copy(packages_src, packages_dst)
+    shutil.copyfile(packages_src, packages_dst)
 
     # Copy airootfs customizations
     airootfs_src = repo_root / "iso" / "airootfs"
     airootfs_dst = profile_dir / "airootfs"
 
     if airootfs_src.exists():
-        for item in airootfs_src.rglob("*"):
-            if item.is_file():
-                rel_path = item.relative_to(airootfs_src)
-                dst_path = airootfs_dst / rel_path
-                dst_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy(item, dst_path)
+        copy_overlay(airootfs_src, airootfs_dst)
 
     # Remove releng boot entries for standard linux kernel (we use linux-lts)
     entries_dir = profile_dir / "efiboot" / "loader" / "entries"
@@ -159,33 +417,28 @@ def setup_archiso_profile(work_dir: Path, repo_root: Path) -> Path:
         boot_src = repo_root / "iso" / boot_dir
         boot_dst = profile_dir / boot_dir
         if boot_src.exists():
-            for item in boot_src.rglob("*"):
-                if item.is_file():
-                    rel_path = item.relative_to(boot_src)
-                    dst_path = boot_dst / rel_path
-                    dst_path.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy(item, dst_path)
-                    log("INFO", f"Copied boot config: {boot_dir}/{rel_path}")
+            copy_overlay(boot_src, boot_dst, partial(copy_boot_config, boot_dir, boot_src))
 
     return profile_dir
 
 
-def inject_ssh_keys(profile_dir: Path, config: dict, repo_root: Path):
+def inject_ssh_keys(profile_dir: Path, config: BuildConfig, repo_root: Path):
     """Inject SSH authorized keys into the ISO."""
     log("STEP", "Injecting SSH authorized keys...")
 
-    ssh_config = config.get("ssh", {})
-    keys_file = ssh_config.get("authorized_keys_file", "config/ssh-keys")
-    keys_path = repo_root / keys_file
+    keys_path = repo_root / config.ssh_authorized_keys_file
 
     if not keys_path.exists():
         log("WARN", f"SSH keys file not found: {keys_path}")
         log("WARN", "No SSH keys will be injected - you may not be able to SSH in!")
         return
 
-    # Read keys
-    with open(keys_path) as f:
-        keys = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    # Read keys in one go and split at C level instead of iterating the file
+    keys = [
+        key
+        for line in keys_path.read_bytes().splitlines()
+        if (key := line.strip()) and not line.startswith(b"#")
+    ]
 
     if not keys:
         log("WARN", "SSH keys file is empty")
@@ -196,8 +449,7 @@ def inject_ssh_keys(profile_dir: Path, config: dict, repo_root: Path):
     auth_keys_dir.mkdir(parents=True, exist_ok=True)
 
     auth_keys_file = auth_keys_dir / "authorized_keys"
-    with open(auth_keys_file, "w") as f:
-        f.write("\n".join(keys) + "\n")
+    auth_keys_file.write_bytes(b"\n".join(keys) + b"\n")
 
     auth_keys_file.chmod(0o600)
     auth_keys_dir.chmod(0o700)
@@ -211,19 +463,14 @@ def configure_pacman(profile_dir: Path, pinned_repo_dir: Path | None):
 
     pacman_conf = profile_dir / "pacman.conf"
 
-    # Read existing config
-    with open(pacman_conf) as f:
-        content = f.read()
-
     # Add ArchZFS repository
     # SigLevel is set to Optional TrustAll because the archzfs GPG key
     # is in the build container's keyring but pacstrap uses a separate keyring
-    archzfs_repo = """
+    servers = "".join(f"Server = {server}\n" for server in ARCHZFS_SERVERS)
+    archzfs_repo = f"""
 [archzfs]
 SigLevel = Optional TrustAll
-Server = https://archzfs.com/$repo/$arch
-Server = https://mirror.sum7.eu/archlinux/archzfs/$repo/$arch
-"""
+{servers}"""
 
     # Add pinned repo if available
     pinned_repo = ""
@@ -234,22 +481,29 @@ SigLevel = Optional TrustAll
 Server = file://{pinned_repo_dir}
 """
 
-    # Insert before [core]
-    if "[core]" in content:
-        content = content.replace("[core]", f"{pinned_repo}{archzfs_repo}[core]")
+    # Stream into a temp file, inserting before [core], then swap it in atomically
+    inserted = False
+    with open(pacman_conf) as src, tempfile.NamedTemporaryFile(
+        "w", dir=pacman_conf.parent, delete=False
+    ) as dst:
+        for line in src:
+            if not inserted and line.startswith("[core]"):
+                dst.write(pinned_repo + archzfs_repo)
+                inserted = True
+            dst.write(line)
 
-    with open(pacman_conf, "w") as f:
-        f.write(content)
+    shutil.copymode(pacman_conf, dst.name)
+    os.replace(dst.name, pacman_conf)
 
 
 def disable_conflicting_services(profile_dir: Path):
     """Disable services that conflict with our minimal setup."""
     log("STEP", "Disabling conflicting services...")
 
-    wants_dir = profile_dir / "airootfs" / "etc" / "systemd" / "system" / "multi-user.target.wants"
+    systemd_dir = profile_dir / "airootfs" / "etc" / "systemd" / "system"
 
     # Services to remove (conflicts with NetworkManager or not needed)
-    services_to_disable = [
+    services_to_disable = {
         # Network conflicts - we only want NetworkManager
         "systemd-networkd.service",
         "systemd-networkd.socket",
@@ -267,23 +521,18 @@ def disable_conflicting_services(profile_dir: Path):
         "livecd-alsa-unmuter.service",
         # Other unnecessary services
         "choose-mirror.service",
-    ]
-
-    for service in services_to_disable:
-        link = wants_dir / service
-        if link.exists() or link.is_symlink():
-            link.unlink()
-            log("INFO", f"Disabled conflicting service: {service}")
+    }
 
-    # Also check other target wants directories
-    for target_wants in ["network-online.target.wants", "sockets.target.wants"]:
-        target_dir = profile_dir / "airootfs" / "etc" / "systemd" / "system" / target_wants
-        if target_dir.exists():
-            for service in services_to_disable:
-                link = target_dir / service
-                if link.exists() or link.is_symlink():
-                    link.unlink()
-                    log("INFO", f"Disabled {service} from {target_wants}")
+    # One directory scan per target instead of probing every service name
+    for target_wants in ["multi-user.target.wants", "network-online.target.wants", "sockets.target.wants"]:
+        target_dir = systemd_dir / target_wants
+        if not target_dir.is_dir():
+            continue
+        with os.scandir(target_dir) as entries:
+            links = [entry for entry in entries if entry.name in services_to_disable]
+        for link in links:
+            os.unlink(link.path)
+            log("INFO", f"Disabled {link.name} from {target_wants}")
 
 
 def cleanup_releng_files(profile_dir: Path):
@@ -315,13 +564,14 @@ def enable_services(profile_dir: Path):
         "NetworkManager.service",
     ]
 
+    with os.scandir(wants_dir) as entries:
+        existing = {entry.name for entry in entries}
+
     for service in services:
-        link = wants_dir / service
-        target = f"/usr/lib/systemd/system/{service}"
         # Skip if link already exists (may be from releng template)
-        if link.exists() or link.is_symlink():
+        if service in existing:
             continue
-        link.symlink_to(target)
+        os.symlink(f"/usr/lib/systemd/system/{service}", os.path.join(wants_dir, service))
 
 
 def build_iso(profile_dir: Path, work_dir: Path, output_dir: Path):
@@ -330,6 +580,23 @@ def build_iso(profile_dir: Path, work_dir: Path, output_dir: Path):
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    jobs = os.cpu_count() or 1
+
+    # mksquashfs uses every core unless the profile pins -processors
+    profiledef = profile_dir / "profiledef.sh"
+    content = profiledef.read_text()
+    # Only the count is replaced; quotes around it must come in pairs
+    tuned = re.sub(r"(-processors['\"]?\s+)(['\"]?)\d+\2", rf"\g<1>\g<2>{jobs}\g<2>", content)
+    if tuned != content:
+        profiledef.write_text(tuned)
+        log("INFO", f"Set mksquashfs -processors to {jobs}")
+
+    # Only reaches tools that read these (e.g. profile hooks); stock mkarchiso
+    # compiles nothing and mksquashfs -comp xz ignores XZ_OPT
+    env = os.environ.copy()
+    env["MAKEFLAGS"] = f"-j{jobs}"
+    env["XZ_OPT"] = f"-T{jobs}"
+
     cmd = [
         "mkarchiso",
         "-v",
@@ -338,7 +605,7 @@ def build_iso(profile_dir: Path, work_dir: Path, output_dir: Path):
         str(profile_dir)
     ]
 
-    run_cmd(cmd)
+    run_cmd(cmd, env=env)
 
     # Find the generated ISO
     for iso in output_dir.glob("*.iso"):
@@ -348,12 +615,73 @@ def build_iso(profile_dir: Path, work_dir: Path, output_dir: Path):
     return None
 
 
+def archzfs_reachable() -> bool:
+    """Check that at least one ArchZFS mirror answers."""
+    for server in ARCHZFS_SERVERS:
+        url = server.replace("$repo", "archzfs").replace("$arch", "x86_64") + "/"
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, method="HEAD"), timeout=3):
+                return True
+        except urllib.error.HTTPError:
+            # The server answered, even if it dislikes HEAD
+            return True
+        except (OSError, http.client.HTTPException):
+            continue
+    return False
+
+
+def preflight_checks(repo_root: Path, skip_pinning: bool):
+    """Verify build prerequisites up front so missing pieces fail fast."""
+    log("STEP", "Checking build prerequisites...")
+
+    checks = {
+        "archiso not installed. Install with: pacman -S archiso": RELENG_PATH.exists,
+        "mkarchiso not found in PATH": lambda: shutil.which("mkarchiso") is not None,
+        "Packages list not found: iso/packages.x86_64": (repo_root / "iso" / "packages.x86_64").exists,
+        "ArchZFS repository unreachable": archzfs_reachable,
+    }
+    if not skip_pinning:
+        checks["zfspin not installed. Install with: pip install zfspin"] = (
+            lambda: importlib.util.find_spec("zfspin") is not None
+        )
+
+    # The network probe dominates, so run everything side by side
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = dict(zip(checks, executor.map(lambda check: check(), checks.values())))
+
+    failed = [msg for msg, ok in results.items() if not ok]
+    for msg in failed:
+        log("ERROR", msg)
+    if failed:
+        sys.exit(1)
+
+
+def discard_work_dir(work_dir: Path):
+    """Delete the work directory in a detached process so the script can exit."""
+    rm = shutil.which("rm")
+    if rm is None:
+        log("INFO", f"Cleaning up work directory: {work_dir}")
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return
+
+    log("INFO", f"Cleaning up work directory in background: {work_dir}")
+    # --one-file-system keeps rm out of anything mkarchiso left mounted
+    subprocess.Popen(
+        [rm, "-rf", "--one-file-system", str(work_dir)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(description="Build minimal Arch Linux ZFS live ISO")
     parser.add_argument("--output-dir", "-o", default="output", help="Output directory for ISO")
     parser.add_argument("--work-dir", "-w", help="Work directory (default: temp)")
     parser.add_argument("--config", "-c", default="config/live-iso.toml", help="Config file")
     parser.add_argument("--skip-pinning", action="store_true", help="Skip kernel pinning (use latest)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the cached pinned repo and releng snapshot")
     args = parser.parse_args()
 
     # Check root
@@ -366,6 +694,9 @@ def main():
     output_dir = Path(args.output_dir).resolve()
     config_path = repo_root / args.config
 
+    # Fail fast before any long-running step
+    preflight_checks(repo_root, args.skip_pinning)
+
     # Load config
     config = load_config(config_path)
 
@@ -381,13 +712,29 @@ def main():
     try:
         log("STEP", f"Work directory: {work_dir}")
 
-        # Setup pinned kernel/ZFS repo
-        pinned_repo_dir = None
-        if not args.skip_pinning:
-            kernel_name, zfs_name, pinned_repo_dir = setup_pinned_kernel_repo(work_dir)
+        # Both cache keys depend on it, so query pacman only once
+        archiso_ver = archiso_version()
+        if archiso_ver is None and not args.no_cache:
+            log("WARN", "Could not determine archiso version, build cache disabled")
 
-        # Setup archiso profile
-        profile_dir = setup_archiso_profile(work_dir, repo_root)
+        # Setup pinned kernel/ZFS repo (network bound) while the archiso
+        # profile (local I/O) is copied - neither depends on the other.
+        # Running threads cannot be cancelled, so a hard profile error (a
+        # failed releng copy) only surfaces once the pinned stage finishes;
+        # a bad cached snapshot is recovered from inside the profile stage.
+        pinned_repo_dir = None
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            if not args.skip_pinning:
+                pinned_future = executor.submit(
+                    setup_pinned_kernel_repo, work_dir, archiso_ver, not args.no_cache
+                )
+            profile_future = executor.submit(
+                setup_archiso_profile, work_dir, repo_root, archiso_ver, not args.no_cache
+            )
+
+            profile_dir = profile_future.result()
+            if not args.skip_pinning:
+                kernel_name, zfs_name, pinned_repo_dir = pinned_future.result()
 
         # Configure pacman
         configure_pacman(profile_dir, pinned_repo_dir)
@@ -417,8 +764,7 @@ def main():
 
     finally:
         if cleanup_work:
-            log("INFO", f"Cleaning up work directory: {work_dir}")
-            shutil.rmtree(work_dir, ignore_errors=True)
+            discard_work_dir(work_dir)
 
 
 if __name__ == "__main__":